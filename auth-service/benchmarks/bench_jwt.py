@@ -0,0 +1,111 @@
+"""JWTのエンコード・デコードのスループットをアルゴリズム・バックエンドごとに計測する
+
+    python -m benchmarks.bench_jwt
+    python -m benchmarks.bench_jwt --number 2000
+
+鍵は実行ごとに生成する。"jose (raw key)" は鍵をキャッシュせずPEM/文字列を毎回渡す従来の方式。
+"""
+import argparse
+import os
+import time
+from datetime import datetime, timedelta
+
+# 設定の必須項目（ベンチマークでは使用しない）
+for key, value in {
+    "DATABASE_URL": "postgresql+asyncpg://localhost/bench",
+    "SECRET_KEY": "bench",
+    "MAIL_USERNAME": "bench",
+    "MAIL_PASSWORD": "bench",
+    "MAIL_FROM": "bench@example.com",
+    "MAIL_PORT": "587",
+    "MAIL_SERVER": "localhost",
+}.items():
+    os.environ.setdefault(key, value)
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
+from jose import jwt as jose_jwt
+
+from src.utils.jwt_codec import JWT_BACKENDS, JWTKey, create_jwt_codec
+
+
+SECRET = "bench-secret-key-with-enough-length-for-hs256"
+
+
+def generate_keys():
+    """アルゴリズムごとの署名鍵を生成する"""
+    return {
+        "HS256": SECRET.encode(),
+        "RS256": rsa.generate_private_key(public_exponent=65537, key_size=2048),
+        "EdDSA": ed25519.Ed25519PrivateKey.generate(),
+    }
+
+
+def ops_per_sec(func, number: int) -> float:
+    start = time.perf_counter()
+    for _ in range(number):
+        func()
+    return number / (time.perf_counter() - start)
+
+
+def claims():
+    return {
+        "sub": "0b7f0d1c-1f43-4c4c-9b59-6f1f3f6c1c1e",
+        "exp": datetime.utcnow() + timedelta(minutes=30),
+        "type": "access",
+        "ver": 0,
+    }
+
+
+class RawJoseCodec:
+    """鍵をキャッシュしない従来の方式（比較用）"""
+
+    def __init__(self, algorithm: str, key):
+        self.algorithm = algorithm
+        if algorithm == "HS256":
+            self.signing_key = self.verification_key = SECRET
+        else:
+            self.signing_key = key.private_bytes(
+                serialization.Encoding.PEM,
+                serialization.PrivateFormat.PKCS8,
+                serialization.NoEncryption()
+            ).decode()
+            self.verification_key = key.public_key().public_bytes(
+                serialization.Encoding.PEM,
+                serialization.PublicFormat.SubjectPublicKeyInfo
+            ).decode()
+
+    def encode(self, payload):
+        return jose_jwt.encode(payload, self.signing_key, algorithm=self.algorithm)
+
+    def decode(self, token):
+        return jose_jwt.decode(token, self.verification_key, algorithms=[self.algorithm])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--number", type=int, default=5000, help="計測回数")
+    args = parser.parse_args()
+
+    print(f"{'algorithm':<10}{'backend':<16}{'encode/s':>12}{'decode/s':>12}")
+    for algorithm, key in generate_keys().items():
+        codecs = {}
+        for backend in JWT_BACKENDS:
+            try:
+                codecs[backend] = create_jwt_codec(backend, JWTKey("bench", algorithm, key))
+            except ValueError:
+                # 非対応のアルゴリズム（joseのEdDSA）
+                continue
+        if algorithm != "EdDSA":
+            codecs["jose (raw key)"] = RawJoseCodec(algorithm, key)
+
+        for backend, codec in codecs.items():
+            token = codec.encode(claims())
+            payload = claims()
+            encode = ops_per_sec(lambda: codec.encode(payload), args.number)
+            decode = ops_per_sec(lambda: codec.decode(token), args.number)
+            print(f"{algorithm:<10}{backend:<16}{encode:>12.0f}{decode:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
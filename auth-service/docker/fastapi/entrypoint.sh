@@ -6,8 +6,8 @@ HOST=${API_HOST:-"0.0.0.0"}
 PORT=${API_PORT:-"8000"}
 
 # データベースのマイグレーションを実行
-echo "Running migrations..."
-alembic upgrade head
+# （アドバイザリロックで排他し、既にheadの場合はすぐに終了する）
+python -m src.core.migrate
 
 # ユーザーappuserとして実行
 exec su -s /bin/bash -c "uvicorn src.main:app --host $HOST --port $PORT --workers 2"
\ No newline at end of file
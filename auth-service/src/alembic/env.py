@@ -1,17 +1,12 @@
 from logging.config import fileConfig
 
 import asyncio
-import os
 from sqlalchemy import pool
 from sqlalchemy.engine import Connection
-from sqlalchemy.ext.asyncio import async_engine_from_config, create_async_engine
+from sqlalchemy.ext.asyncio import create_async_engine
 
 from alembic import context
 
-from src.core.database import Base, DATABASE_URL
-from src.models.user import User
-from src.models.token import RefreshToken, PasswordResetToken
-
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -22,11 +17,34 @@ config = context.config
 if config.config_file_name is not None:
     fileConfig(config.config_file_name)
 
+
+def get_target_metadata():
+    """モデルを読み込んでメタデータを返す
+
+    src.core.migrate から接続が渡された場合（起動時のupgrade）はメタデータを使わないため、
+    設定やモデル（メール設定を含む）を読み込まずに済ませる。
+    alembic CLI（revision --autogenerate、check等）では常に読み込む。
+    """
+    if config.attributes.get("connection") is not None:
+        return None
+
+    from src.core.database import Base
+    # モデルをメタデータに登録するためにインポートする
+    from src.models.user import User  # noqa: F401
+    from src.models.token import RefreshToken, PasswordResetToken  # noqa: F401
+    return Base.metadata
+
+
+def get_database_url() -> str:
+    from src.core.database import DATABASE_URL
+    return DATABASE_URL
+
+
 # add your model's MetaData object here
 # for 'autogenerate' support
 # from myapp import mymodel
 # target_metadata = mymodel.Base.metadata
-target_metadata = Base.metadata
+target_metadata = get_target_metadata()
 
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
@@ -47,12 +65,13 @@ def run_migrations_offline() -> None:
 
     """
     # 環境変数から生成されたDATABASE_URLを使用
-    url = DATABASE_URL
+    url = get_database_url()
     context.configure(
         url=url,
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        transaction_per_migration=True,
     )
 
     with context.begin_transaction():
@@ -65,7 +84,7 @@ async def run_async_migrations() -> None:
     """
     # 直接create_async_engineを使用して接続
     connectable = create_async_engine(
-        DATABASE_URL,
+        get_database_url(),
         poolclass=pool.NullPool,
     )
 
@@ -75,17 +94,28 @@ async def run_async_migrations() -> None:
     await connectable.dispose()
 
 def do_run_migrations(connection: Connection) -> None:
-    context.configure(connection=connection, target_metadata=target_metadata)
+    # マイグレーションごとにトランザクションを分けることで、
+    # op.get_context().autocommit_block() による CREATE INDEX CONCURRENTLY 等を可能にする
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        transaction_per_migration=True,
+    )
 
     with context.begin_transaction():
         context.run_migrations()
 
 def run_migrations_online() -> None:
     """Run migrations in 'online' mode."""
-    asyncio.run(run_async_migrations())
+    # src.core.migrate から接続が渡された場合はそれを使用する
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        do_run_migrations(connection)
+    else:
+        asyncio.run(run_async_migrations())
 
 
 if context.is_offline_mode():
     run_migrations_offline()
 else:
-    run_migrations_online()
\ No newline at end of file
+    run_migrations_online()
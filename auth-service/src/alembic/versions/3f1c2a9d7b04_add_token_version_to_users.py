@@ -0,0 +1,47 @@
+"""add token_version to users
+
+Revision ID: 3f1c2a9d7b04
+Revises:
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from typing import Optional, Sequence, Set, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f1c2a9d7b04'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _users_columns() -> Optional[Set[str]]:
+    """usersテーブルのカラム名。テーブルが無い場合はNone
+
+    新規DBではusersテーブルはアプリ起動時の Database.init()（create_all）で
+    token_version込みで作成されるため、テーブルが無い場合は何もしない。
+    """
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table("users"):
+        return None
+    return {column["name"] for column in inspector.get_columns("users")}
+
+
+def upgrade() -> None:
+    # 既存ユーザーは0から開始（ver クレームを持たない既存トークンも0として扱われる）
+    # create_all済みのDBでは既に存在する
+    columns = _users_columns()
+    if columns is not None and "token_version" not in columns:
+        op.add_column(
+            "users",
+            sa.Column("token_version", sa.Integer(), server_default="0", nullable=False),
+        )
+
+
+def downgrade() -> None:
+    columns = _users_columns()
+    if columns is not None and "token_version" in columns:
+        op.drop_column("users", "token_version")
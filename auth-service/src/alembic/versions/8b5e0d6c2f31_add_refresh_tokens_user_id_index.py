@@ -0,0 +1,52 @@
+"""add refresh_tokens.user_id index concurrently
+
+Revision ID: 8b5e0d6c2f31
+Revises: 3f1c2a9d7b04
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b5e0d6c2f31'
+down_revision: Union[str, None] = '3f1c2a9d7b04'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _has_refresh_tokens() -> bool:
+    # 新規DBではテーブルはアプリ起動時の Database.init()（create_all）でインデックス込みで作成される
+    return sa.inspect(op.get_bind()).has_table("refresh_tokens")
+
+
+def upgrade() -> None:
+    if not _has_refresh_tokens():
+        return
+
+    # CONCURRENTLY はトランザクション内で実行できないため autocommit で実行する
+    # （大きなテーブルでも書き込みをブロックしない）
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_refresh_tokens_user_id",
+            "refresh_tokens",
+            ["user_id"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    if not _has_refresh_tokens():
+        return
+
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_refresh_tokens_user_id",
+            table_name="refresh_tokens",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
@@ -1,11 +1,18 @@
 from datetime import datetime, timedelta
+from typing import Optional
+from uuid import UUID
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import select, update
-from sqlalchemy.orm import Session
-from src.core.database import get_db
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.core.database import get_db, get_read_db
 from src.core.config import settings
+from src.core.user_cache import UserPrincipal, user_cache
 from src.models.user import User
 from src.models.token import RefreshToken, PasswordResetToken
+from src.models.queries import (
+    USER_BY_EMAIL, USER_BY_ID, ACTIVE_REFRESH_TOKEN_BY_TOKEN,
+    VALID_RESET_TOKEN_BY_TOKEN
+)
 from src.schemas.auth import (
     UserCreate, UserLogin, UserResponse, Token, 
     PasswordReset, PasswordResetConfirm, TokenRefresh,
@@ -13,17 +20,47 @@ from src.schemas.auth import (
 )
 from src.utils.auth_utils import (
     get_password_hash, verify_password, create_token,
-    verify_token, send_password_reset_email, generate_reset_token
+    verify_token, verify_token_version, send_password_reset_email,
+    generate_reset_token
 )
 
 router = APIRouter()
 
+async def get_user_principal(
+    db: AsyncSession,
+    user_id: str,
+    primary_db: Optional[AsyncSession] = None,
+    use_cache: bool = True
+) -> UserPrincipal:
+    """キャッシュまたはDBからユーザープリンシパルを取得する
+
+    dbがレプリカの場合はprimary_dbを渡すと、レプリカ未反映のユーザーをプライマリで再検索する。
+    use_cache=Falseの場合はキャッシュを参照せずDBから読み直し、結果を再キャッシュする。
+    """
+    principal = user_cache.get(user_id) if use_cache else None
+    if principal is None:
+        params = {"user_id": UUID(user_id)}
+        result = await db.execute(USER_BY_ID, params)
+        user = result.scalar_one_or_none()
+        if not user and primary_db is not None:
+            result = await primary_db.execute(USER_BY_ID, params)
+            user = result.scalar_one_or_none()
+
+        if not user:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="User not found"
+            )
+        principal = UserPrincipal.from_user(user)
+        user_cache.set(principal)
+    return principal
+
 @router.post("/register", response_model=UserResponse)
-async def register(user_data: UserCreate, db: Session = Depends(get_db)):
+async def register(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
     """新規ユーザー登録"""
     # メールアドレスの重複チェック
-    stmt = select(User).where(User.email == user_data.email)
-    if db.execute(stmt).scalar_one_or_none():
+    result = await db.execute(USER_BY_EMAIL, {"email": user_data.email})
+    if result.scalar_one_or_none():
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
@@ -32,21 +69,21 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
     # ユーザー作成
     user = User(
         email=user_data.email,
-        password_hash=get_password_hash(user_data.password)
+        hashed_password=get_password_hash(user_data.password)
     )
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
     
     return user
 
 @router.post("/login", response_model=Token)
-async def login(user_data: UserLogin, db: Session = Depends(get_db)):
+async def login(user_data: UserLogin, db: AsyncSession = Depends(get_db)):
     """ユーザーログイン"""
-    stmt = select(User).where(User.email == user_data.email)
-    user = db.execute(stmt).scalar_one_or_none()
+    result = await db.execute(USER_BY_EMAIL, {"email": user_data.email})
+    user = result.scalar_one_or_none()
     
-    if not user or not verify_password(user_data.password, user.password_hash):
+    if not user or not verify_password(user_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password"
@@ -56,12 +93,14 @@ async def login(user_data: UserLogin, db: Session = Depends(get_db)):
     access_token = create_token(
         str(user.id),
         settings.ACCESS_TOKEN_EXPIRE_DELTA,
-        "access"
+        "access",
+        user.token_version
     )
     refresh_token = create_token(
         str(user.id),
         settings.REFRESH_TOKEN_EXPIRE_DELTA,
-        "refresh"
+        "refresh",
+        user.token_version
     )
     
     # リフレッシュトークンをデータベースに保存
@@ -71,7 +110,10 @@ async def login(user_data: UserLogin, db: Session = Depends(get_db)):
         expires_at=datetime.utcnow() + settings.REFRESH_TOKEN_EXPIRE_DELTA
     )
     db.add(db_refresh_token)
-    db.commit()
+    await db.commit()
+
+    # トークン検証時にDBを参照しなくて済むようにキャッシュしておく
+    user_cache.set(UserPrincipal.from_user(user))
     
     return Token(
         access_token=access_token,
@@ -79,23 +121,27 @@ async def login(user_data: UserLogin, db: Session = Depends(get_db)):
     )
 
 @router.post("/refresh", response_model=Token)
-async def refresh_token(token_data: TokenRefresh, db: Session = Depends(get_db)):
+async def refresh_token(token_data: TokenRefresh, db: AsyncSession = Depends(get_db)):
     """リフレッシュトークンを使用して新しいアクセストークンを取得"""
     # リフレッシュトークンを検証
     token_payload = verify_token(token_data.refresh_token, "refresh")
     
-    # データベースでリフレッシュトークンを確認
-    stmt = select(RefreshToken).where(
-        RefreshToken.token == token_data.refresh_token,
-        RefreshToken.is_revoked == False
+    # データベース（プライマリ）でリフレッシュトークンとユーザーの現在のトークン世代を確認
+    result = await db.execute(
+        ACTIVE_REFRESH_TOKEN_BY_TOKEN,
+        {"token": token_data.refresh_token}
     )
-    db_token = db.execute(stmt).scalar_one_or_none()
+    row = result.one_or_none()
     
-    if not db_token or db_token.expires_at < datetime.utcnow():
+    if not row or row.RefreshToken.expires_at < datetime.utcnow():
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid or expired refresh token"
         )
+    db_token, token_version = row
+
+    # 全トークン失効（トークン世代の更新）後のトークンは拒否。キャッシュは使わず即時に反映する
+    verify_token_version(token_payload, token_version)
     
     # 古いリフレッシュトークンを無効化
     db_token.is_revoked = True
@@ -104,12 +150,14 @@ async def refresh_token(token_data: TokenRefresh, db: Session = Depends(get_db))
     new_access_token = create_token(
         token_payload.sub,
         settings.ACCESS_TOKEN_EXPIRE_DELTA,
-        "access"
+        "access",
+        token_version
     )
     new_refresh_token = create_token(
         token_payload.sub,
         settings.REFRESH_TOKEN_EXPIRE_DELTA,
-        "refresh"
+        "refresh",
+        token_version
     )
     
     # 新しいリフレッシュトークンをデータベースに保存
@@ -119,7 +167,7 @@ async def refresh_token(token_data: TokenRefresh, db: Session = Depends(get_db))
         expires_at=datetime.utcnow() + settings.REFRESH_TOKEN_EXPIRE_DELTA
     )
     db.add(new_db_token)
-    db.commit()
+    await db.commit()
     
     return Token(
         access_token=new_access_token,
@@ -127,27 +175,44 @@ async def refresh_token(token_data: TokenRefresh, db: Session = Depends(get_db))
     )
 
 @router.post("/token/verify")
-async def verify_token_endpoint(token: str, db: Session = Depends(get_db)):
+async def verify_token_endpoint(
+    token: str,
+    db: AsyncSession = Depends(get_read_db),
+    primary_db: AsyncSession = Depends(get_db)
+):
     """トークンを検証してユーザー情報を返す"""
     token_data = verify_token(token)
-    stmt = select(User).where(User.id == token_data.sub)
-    user = db.execute(stmt).scalar_one_or_none()
-    
-    if not user:
+
+    # キャッシュにあればDBを参照しない。DBはレプリカを優先する
+    # （primary_dbのセッションは実際に使うまで接続しない）
+    principal = await get_user_principal(db, token_data.sub, primary_db)
+    if token_data.ver > principal.token_version:
+        # キャッシュまたはレプリカの世代が古い（別ワーカーでのリセット後に発行されたトークン等）。
+        # 新しいトークンを拒否しないよう、プライマリで読み直して再キャッシュする
+        principal = await get_user_principal(primary_db, token_data.sub, use_cache=False)
+    # 世代が古いトークンは読み直さずに拒否する。ただしキャッシュはワーカーごとのため、
+    # 別ワーカーでのパスワードリセット後も、そのワーカーが古い世代を保持している間
+    # （レプリカの遅延 + 最大USER_CACHE_TTL_SECONDS）は失効済みのアクセストークンを
+    # 受け付ける（意図的な制限）。レプリカの遅延はヘルスチェックの間隔内では
+    # DATABASE_REPLICA_MAX_LAG_SECONDSを超え得る。
+    # リフレッシュは常にプライマリで世代を確認するため、この間に新しいトークンは発行されない。
+    verify_token_version(token_data, principal.token_version)
+
+    if not principal.is_active:
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found"
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Inactive user"
         )
-    return {"user_id": str(user.id), "email": user.email}
+    return {"user_id": principal.user_id, "email": principal.email}
 
 @router.post("/password/reset", response_model=MessageResponse)
 async def request_password_reset(
     reset_data: PasswordReset,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """パスワードリセットをリクエスト"""
-    stmt = select(User).where(User.email == reset_data.email)
-    user = db.execute(stmt).scalar_one_or_none()
+    result = await db.execute(USER_BY_EMAIL, {"email": reset_data.email})
+    user = result.scalar_one_or_none()
     
     if not user:
         # ユーザーが存在しない場合でもセキュリティのため成功を装う
@@ -162,7 +227,7 @@ async def request_password_reset(
         )
         .values(is_used=True)
     )
-    db.execute(stmt)
+    await db.execute(stmt)
     
     # 新しいリセットトークンを生成
     token = generate_reset_token()
@@ -172,7 +237,7 @@ async def request_password_reset(
         expires_at=datetime.utcnow() + timedelta(hours=1)
     )
     db.add(reset_token)
-    db.commit()
+    await db.commit()
     
     # リセットメールを送信
     await send_password_reset_email(user.email, token)
@@ -182,15 +247,14 @@ async def request_password_reset(
 @router.post("/password/reset/confirm", response_model=MessageResponse)
 async def confirm_password_reset(
     reset_data: PasswordResetConfirm,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """パスワードリセットを実行"""
-    stmt = select(PasswordResetToken).where(
-        PasswordResetToken.token == reset_data.token,
-        PasswordResetToken.is_used == False,
-        PasswordResetToken.expires_at > datetime.utcnow()
+    result = await db.execute(
+        VALID_RESET_TOKEN_BY_TOKEN,
+        {"token": reset_data.token, "now": datetime.utcnow()}
     )
-    reset_token = db.execute(stmt).scalar_one_or_none()
+    reset_token = result.scalar_one_or_none()
     
     if not reset_token:
         raise HTTPException(
@@ -199,23 +263,23 @@ async def confirm_password_reset(
         )
     
     # パスワードを更新
-    stmt = select(User).where(User.id == reset_token.user_id)
-    user = db.execute(stmt).scalar_one_or_none()
-    user.password_hash = get_password_hash(reset_data.new_password)
+    result = await db.execute(USER_BY_ID, {"user_id": reset_token.user_id})
+    user = result.scalar_one_or_none()
+    user.hashed_password = get_password_hash(reset_data.new_password)
     
     # リセットトークンを使用済みにする
     reset_token.is_used = True
     
-    # ユーザーの全てのリフレッシュトークンを無効化
-    stmt = (
-        update(RefreshToken)
-        .where(
-            RefreshToken.user_id == user.id,
-            RefreshToken.is_revoked == False
-        )
-        .values(is_revoked=True)
+    # トークン世代を進めて発行済みの全トークン（アクセス・リフレッシュ）を無効化
+    # 同時実行でも増分が失われないようDB側で加算する
+    await db.execute(
+        update(User)
+        .where(User.id == user.id)
+        .values(token_version=User.token_version + 1)
     )
-    db.execute(stmt)
-    db.commit()
+    await db.commit()
+
+    # キャッシュ済みのユーザー情報を破棄
+    user_cache.invalidate(user.id)
     
     return MessageResponse(message="Password has been reset successfully")
@@ -0,0 +1,28 @@
+import secrets
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+
+from src.core.config import settings
+from src.core.user_cache import user_cache
+
+
+def verify_ops_token(x_ops_token: Optional[str] = Header(default=None)) -> None:
+    """運用APIのトークンを検証する。OPS_API_TOKEN未設定の場合は運用APIを公開しない"""
+    if not settings.OPS_API_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if x_ops_token is None or not secrets.compare_digest(x_ops_token, settings.OPS_API_TOKEN):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid ops token"
+        )
+
+
+# 運用・監視用の内部API（認証APIとは別にマウントする）
+router = APIRouter(dependencies=[Depends(verify_ops_token)])
+
+
+@router.get("/metrics/user-cache")
+async def user_cache_metrics():
+    """ユーザーキャッシュの統計情報（ヒット率・件数・追い出し数）を返す"""
+    return user_cache.stats()
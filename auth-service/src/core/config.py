@@ -1,23 +1,47 @@
 from pydantic_settings import BaseSettings
 from pydantic import Field, ConfigDict, EmailStr
-from typing import Optional
+from typing import List, Optional
 from datetime import timedelta
 
 class Settings(BaseSettings):
     # データベース設定
     DATABASE_URL: str = Field(..., json_schema_extra={"env": "DATABASE_URL"})
-    # データベース設定
-    database_host: str = Field(default="localhost", json_schema_extra={"env": "DATABASE_HOST"})
-    database_port: int = Field(default=5432, json_schema_extra={"env": "DATABASE_PORT"})
-    database_user: str = Field(default="my_database_user", json_schema_extra={"env": "DATABASE_USER"})
-    database_password: str = Field(default="my_database_password", json_schema_extra={"env": "DATABASE_PASSWORD"})
-    database_name: str = Field(default="my_database", json_schema_extra={"env": "DATABASE_NAME"})
+    # データベース設定（フィールド名は小文字のため、環境変数名はvalidation_aliasで指定する）
+    database_host: str = Field(default="localhost", validation_alias="DATABASE_HOST", json_schema_extra={"env": "DATABASE_HOST"})
+    database_port: int = Field(default=5432, validation_alias="DATABASE_PORT", json_schema_extra={"env": "DATABASE_PORT"})
+    database_user: str = Field(default="my_database_user", validation_alias="DATABASE_USER", json_schema_extra={"env": "DATABASE_USER"})
+    database_password: str = Field(default="my_database_password", validation_alias="DATABASE_PASSWORD", json_schema_extra={"env": "DATABASE_PASSWORD"})
+    database_name: str = Field(default="my_database", validation_alias="DATABASE_NAME", json_schema_extra={"env": "DATABASE_NAME"})
+    # リードレプリカ設定（カンマ区切りのURL。空の場合は全てプライマリに接続）
+    DATABASE_REPLICA_URLS: str = Field(default="", json_schema_extra={"env": "DATABASE_REPLICA_URLS"})
+    DATABASE_REPLICA_MAX_LAG_SECONDS: float = Field(default=5.0, json_schema_extra={"env": "DATABASE_REPLICA_MAX_LAG_SECONDS"})
+    DATABASE_REPLICA_HEALTH_CHECK_INTERVAL: float = Field(default=10.0, json_schema_extra={"env": "DATABASE_REPLICA_HEALTH_CHECK_INTERVAL"})
+    DATABASE_REPLICA_HEALTH_CHECK_TIMEOUT: float = Field(default=2.0, json_schema_extra={"env": "DATABASE_REPLICA_HEALTH_CHECK_TIMEOUT"})
+    # ステートメントキャッシュ設定
+    # SQLAlchemy asyncpgダイアレクトのプリペアドステートメントキャッシュ（接続ごと）
+    # SQLAlchemyはconnection.prepare()で実行するため、asyncpg自身のstatement_cache_sizeは使われない
+    DATABASE_PREPARED_STATEMENT_CACHE_SIZE: int = Field(default=100, json_schema_extra={"env": "DATABASE_PREPARED_STATEMENT_CACHE_SIZE"})
+    # SQLAlchemyのコンパイル済みクエリキャッシュ（エンジンごと）
+    DATABASE_QUERY_CACHE_SIZE: int = Field(default=500, json_schema_extra={"env": "DATABASE_QUERY_CACHE_SIZE"})
+    # PgBouncer等のトランザクションプーリング経由で接続する場合はTrue
+    # 実行ごとに一意な名前でprepareし、プリペアドステートメントを接続にキャッシュしない
+    DATABASE_DISABLE_PREPARED_STATEMENTS: bool = Field(default=False, json_schema_extra={"env": "DATABASE_DISABLE_PREPARED_STATEMENTS"})
+    # 実行したSQLをログに出力する（開発用）
+    DATABASE_ECHO: bool = Field(default=False, json_schema_extra={"env": "DATABASE_ECHO"})
 
     # JWT設定
     SECRET_KEY: str = Field(..., json_schema_extra={"env": "SECRET_KEY"})
     ALGORITHM: str = Field(default="HS256", json_schema_extra={"env": "ALGORITHM"})
     ACCESS_TOKEN_EXPIRE_MINUTES: int = Field(default=30, json_schema_extra={"env": "ACCESS_TOKEN_EXPIRE_MINUTES"})
     REFRESH_TOKEN_EXPIRE_DAYS: int = Field(default=7, json_schema_extra={"env": "REFRESH_TOKEN_EXPIRE_DAYS"})
+    # JWTライブラリ（"pyjwt" または "jose"。joseはEdDSA非対応）
+    JWT_BACKEND: str = Field(default="pyjwt", json_schema_extra={"env": "JWT_BACKEND"})
+    # 署名鍵のID（トークンヘッダーのkid）
+    JWT_KEY_ID: str = Field(default="default", json_schema_extra={"env": "JWT_KEY_ID"})
+    # RS256/EdDSA用の秘密鍵（PEM文字列またはファイルパス）。HS256ではSECRET_KEYを使用
+    JWT_PRIVATE_KEY: Optional[str] = Field(default=None, json_schema_extra={"env": "JWT_PRIVATE_KEY"})
+    # ローテーション中も検証を受け付ける旧鍵（"kid:ALG:path" のカンマ区切り）
+    JWT_PREVIOUS_KEYS: str = Field(default="", json_schema_extra={"env": "JWT_PREVIOUS_KEYS"})
 
     # メール設定
     MAIL_USERNAME: str = Field(..., json_schema_extra={"env": "MAIL_USERNAME"})
@@ -32,6 +56,19 @@ class Settings(BaseSettings):
     LOGIN_RATE_LIMIT: str = Field(default="5/minute", json_schema_extra={"env": "LOGIN_RATE_LIMIT"})
     PASSWORD_RESET_RATE_LIMIT: str = Field(default="3/hour", json_schema_extra={"env": "PASSWORD_RESET_RATE_LIMIT"})
 
+    # ユーザーキャッシュ設定（ワーカープロセスごと）
+    # TTLは他ワーカーでの失効（パスワードリセット）がトークン検証に反映されるまでの遅延でもある
+    # （リードレプリカ使用時はレプリカの遅延が加わる）
+    USER_CACHE_MAX_ENTRIES: int = Field(default=10000, json_schema_extra={"env": "USER_CACHE_MAX_ENTRIES"})
+    USER_CACHE_TTL_SECONDS: int = Field(default=60, json_schema_extra={"env": "USER_CACHE_TTL_SECONDS"})
+
+    # 運用API設定（X-Ops-Tokenヘッダーで認証。未設定の場合は運用APIを無効にする）
+    OPS_API_TOKEN: Optional[str] = Field(default=None, json_schema_extra={"env": "OPS_API_TOKEN"})
+
+    @property
+    def database_replica_urls(self) -> List[str]:
+        return [url.strip() for url in self.DATABASE_REPLICA_URLS.split(",") if url.strip()]
+
     @property
     def ACCESS_TOKEN_EXPIRE_DELTA(self) -> timedelta:
         return timedelta(minutes=self.ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -1,7 +1,12 @@
+import asyncio
 import datetime
 import os
+import time
+import uuid
 
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
 from sqlalchemy.orm import declarative_base, sessionmaker
 
 from src.core.config import settings
@@ -16,31 +21,202 @@ DATABASE_URL = (
 
 Base = declarative_base()
 
+# レプリカの遅延（秒）。レプリカでない場合や再生が追いついている場合は0
+REPLICA_LAG_QUERY = text(
+    """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+    """
+)
+
+
+# URLごとのエンジン。Databaseを何度生成しても接続プールと
+# ステートメントキャッシュ（接続ごとに保持される）を使い回す
+_engines = {}
+
+
+def _prepared_statement_name() -> str:
+    # トランザクションプーリングでは別クライアントの同名ステートメントと衝突し得るため一意にする
+    return f"__asyncpg_{uuid.uuid4()}__"
+
+
+def get_engine(url: str) -> AsyncEngine:
+    """URLに対応するエンジンを取得する（初回のみ作成）"""
+    engine = _engines.get(url)
+    if engine is not None:
+        return engine
+
+    if settings.DATABASE_DISABLE_PREPARED_STATEMENTS:
+        # prepare自体は行われるが、名前を一意にして接続にキャッシュしない
+        prepared_statement_cache_size = 0
+        connect_args = {
+            "statement_cache_size": 0,
+            "prepared_statement_name_func": _prepared_statement_name,
+        }
+    else:
+        prepared_statement_cache_size = settings.DATABASE_PREPARED_STATEMENT_CACHE_SIZE
+        connect_args = {}
+
+    engine_url = make_url(url).update_query_dict(
+        {"prepared_statement_cache_size": str(prepared_statement_cache_size)}
+    )
+    engine = create_async_engine(
+        engine_url,
+        echo=settings.DATABASE_ECHO,
+        query_cache_size=settings.DATABASE_QUERY_CACHE_SIZE,
+        connect_args=connect_args,
+    )
+    _engines[url] = engine
+    return engine
+
+
+def _create_session_factory(engine):
+    return sessionmaker(
+        engine,
+        class_=AsyncSession,
+        autocommit=False,
+        autoflush=False,
+        expire_on_commit=False
+    )
+
+
+class Replica:
+    """リードレプリカのエンジンとヘルスチェック状態"""
+
+    def __init__(self, url: str):
+        self.url = url
+        self.engine = get_engine(url)
+        self.async_session_factory = _create_session_factory(self.engine)
+        self.healthy = False
+        self.lag_seconds = None
+        self.checked_at = None
+        # 同時に複数のリクエストがヘルスチェックを始めないようにする
+        self.checking = False
+        self._check_task = None
+
+    def needs_check(self) -> bool:
+        if self.checking:
+            return False
+        return (
+            self.checked_at is None
+            or time.monotonic() - self.checked_at >= settings.DATABASE_REPLICA_HEALTH_CHECK_INTERVAL
+        )
+
+    def start_check(self) -> asyncio.Task:
+        """ヘルスチェックをバックグラウンドで開始する。実行中の場合はそのタスクを返す"""
+        if self._check_task is None or self._check_task.done():
+            self.checking = True
+            self._check_task = asyncio.create_task(self.check())
+        return self._check_task
+
+    async def cancel_check(self):
+        """実行中のヘルスチェックを中断する"""
+        if self._check_task is not None and not self._check_task.done():
+            self._check_task.cancel()
+            try:
+                await self._check_task
+            except asyncio.CancelledError:
+                pass
+
+    async def _query_lag(self) -> float:
+        async with self.engine.connect() as conn:
+            result = await conn.execute(REPLICA_LAG_QUERY)
+            return float(result.scalar_one())
+
+    async def check(self) -> bool:
+        """疎通と遅延を確認し、許容範囲内であれば健全とみなす
+
+        接続確立を含めてDATABASE_REPLICA_HEALTH_CHECK_TIMEOUT秒で打ち切る。
+        """
+        self.checking = True
+        try:
+            self.lag_seconds = await asyncio.wait_for(
+                self._query_lag(),
+                timeout=settings.DATABASE_REPLICA_HEALTH_CHECK_TIMEOUT
+            )
+            self.healthy = self.lag_seconds <= settings.DATABASE_REPLICA_MAX_LAG_SECONDS
+        except Exception:
+            self.lag_seconds = None
+            self.healthy = False
+        finally:
+            self.checked_at = time.monotonic()
+            self.checking = False
+        return self.healthy
+
+
 class Database:
     def __init__(self):
         """非同期エンジンの作成, セッションの作成"""
-        self.engine = create_async_engine(
-            DATABASE_URL,
-            echo=True,
-        )
-        self.async_session_factory = sessionmaker(
-            self.engine,
-            class_=AsyncSession,
-            autocommit=False,
-            autoflush=False,
-            expire_on_commit=False
-        )
-    
+        self.engine = get_engine(DATABASE_URL)
+        self.async_session_factory = _create_session_factory(self.engine)
+        self.replicas = [Replica(url) for url in settings.database_replica_urls]
+        self._next_replica = 0
+        self._initialized = False
+        self._init_lock = asyncio.Lock()
+
     async def init(self):
-        """データベースの初期化"""
-        async with self.engine.begin() as conn:
-            await conn.run_sync(Base.metadata.create_all)
+        """データベースの初期化（プロセスごとに一度だけ行う）"""
+        async with self._init_lock:
+            if self._initialized:
+                return
+            async with self.engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+            await self.check_replicas()
+            self._initialized = True
         await self.connect_db()
-    
+
     async def connect_db(self):
         """非同期セッションの作成"""
         return self.async_session_factory
 
     def get_session_factory(self):
         """セッションファクトリーの取得。awaitする必要なし"""
-        return self.async_session_factory
\ No newline at end of file
+        return self.async_session_factory
+
+    async def get_read_session_factory(self):
+        """読み取り専用セッションファクトリーの取得
+
+        健全なレプリカをラウンドロビンで選択し、無ければプライマリを返す。
+        ヘルスチェックの期限が来たレプリカはバックグラウンドで再チェックし、
+        リクエストは待たずに直前の結果で判定する（未チェックのレプリカは使わない）。
+        """
+        for _ in range(len(self.replicas)):
+            replica = self.replicas[self._next_replica]
+            self._next_replica = (self._next_replica + 1) % len(self.replicas)
+
+            if replica.needs_check():
+                replica.start_check()
+            if replica.healthy:
+                return replica.async_session_factory
+
+        return self.async_session_factory
+
+    async def check_replicas(self):
+        """全レプリカのヘルスチェックを実行し、完了を待つ"""
+        await asyncio.gather(*(replica.start_check() for replica in self.replicas))
+
+    async def dispose(self):
+        """全エンジンの接続プールを破棄する"""
+        await self.engine.dispose()
+        for replica in self.replicas:
+            await replica.cancel_check()
+            await replica.engine.dispose()
+
+
+database = Database()
+
+
+async def get_db():
+    """書き込み・書き込み直後の読み取り用セッション（常にプライマリ）"""
+    async with database.get_session_factory()() as session:
+        yield session
+
+
+async def get_read_db():
+    """読み取り専用セッション（レプリカ、利用不可の場合はプライマリ）"""
+    session_factory = await database.get_read_session_factory()
+    async with session_factory() as session:
+        yield session
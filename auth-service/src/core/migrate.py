@@ -0,0 +1,104 @@
+"""コンテナ起動時のマイグレーション
+
+複数のインスタンスが同時に起動しても1つだけがマイグレーションを実行するよう、
+Postgresのアドバイザリロックで排他制御する。既にheadの場合はアプリケーション
+（設定・モデル・メール設定）を読み込まずに終了する。
+
+    python -m src.core.migrate
+
+ロックを取得できない場合は$MIGRATION_LOCK_TIMEOUT秒（デフォルト300秒）で失敗する。
+"""
+import os
+import time
+
+from alembic import command
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from dotenv import dotenv_values
+from sqlalchemy import create_engine, pool, text
+from sqlalchemy.engine import URL
+
+
+ALEMBIC_INI = os.environ.get("ALEMBIC_CONFIG", "alembic.ini")
+# マイグレーション用アドバイザリロックのキー（サービス内で一意であればよい）
+MIGRATION_LOCK_ID = 7243016529
+# ロック待ちの上限（秒）。保持しているインスタンスが停止した場合に起動が止まり続けないようにする
+MIGRATION_LOCK_TIMEOUT = float(os.environ.get("MIGRATION_LOCK_TIMEOUT", "300"))
+MIGRATION_LOCK_POLL_INTERVAL = 1.0
+
+
+def get_database_url() -> URL:
+    """アプリと同じDATABASE_*の設定・デフォルト値から接続URLを組み立てる（同期ドライバ）
+
+    Settingsと同様に環境変数を.envより優先する。src.core.databaseのDATABASE_URLと
+    同じサーバーに接続するため、$DATABASE_URLは参照しない。
+    """
+    env = {**dotenv_values(".env"), **os.environ}
+    return URL.create(
+        "postgresql+psycopg2",
+        username=env.get("DATABASE_USER", "my_database_user"),
+        password=env.get("DATABASE_PASSWORD", "my_database_password"),
+        host=env.get("DATABASE_HOST", "localhost"),
+        port=int(env.get("DATABASE_PORT", "5432")),
+        database=env.get("DATABASE_NAME", "my_database"),
+    )
+
+
+def acquire_lock(connection, timeout: float = MIGRATION_LOCK_TIMEOUT) -> None:
+    """アドバイザリロックを取得する。timeout秒以内に取得できない場合はTimeoutError"""
+    deadline = time.monotonic() + timeout
+    while True:
+        acquired = connection.execute(
+            text("SELECT pg_try_advisory_lock(:lock_id)"), {"lock_id": MIGRATION_LOCK_ID}
+        ).scalar_one()
+        connection.commit()
+        if acquired:
+            return
+        if time.monotonic() >= deadline:
+            raise TimeoutError(f"Could not acquire migration lock within {timeout} seconds")
+        time.sleep(MIGRATION_LOCK_POLL_INTERVAL)
+
+
+def get_current_heads(connection) -> set:
+    """DBに記録されているリビジョン（alembic_versionが無い場合は空）"""
+    return set(MigrationContext.configure(connection).get_current_heads())
+
+
+def migrate() -> None:
+    config = Config(ALEMBIC_INI)
+    heads = set(ScriptDirectory.from_config(config).get_heads())
+
+    engine = create_engine(get_database_url(), poolclass=pool.NullPool)
+    try:
+        with engine.connect() as connection:
+            # 既にheadであればロックを取らずに終了
+            if get_current_heads(connection) == heads:
+                print("Database is already up to date.")
+                return
+            connection.commit()
+
+            # セッションレベルのロックなのでマイグレーション中のコミットでは解放されない
+            print("Waiting for migration lock...")
+            acquire_lock(connection)
+            try:
+                # 待機中に別インスタンスが完了させている場合がある
+                if get_current_heads(connection) == heads:
+                    print("Database was migrated by another instance.")
+                    return
+                connection.commit()
+
+                print("Running migrations...")
+                config.attributes["connection"] = connection
+                command.upgrade(config, "head")
+                connection.commit()
+            finally:
+                connection.rollback()
+                connection.execute(text("SELECT pg_advisory_unlock(:lock_id)"), {"lock_id": MIGRATION_LOCK_ID})
+                connection.commit()
+    finally:
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    migrate()
@@ -1,11 +1,18 @@
-from .database import Database
+from .database import database
 
 
 class AsyncContextManager:
+    def __init__(self, readonly: bool = False):
+        # readonly=Trueの場合はリードレプリカに接続する
+        self.readonly = readonly
+
     async def __aenter__(self):
-        db = Database()
-        await db.init()
-        session_factory = await db.connect_db()
+        # エンジン・レプリカの状態はプロセス内で共有する（初期化は初回のみ）
+        await database.init()
+        if self.readonly:
+            session_factory = await database.get_read_session_factory()
+        else:
+            session_factory = await database.connect_db()
         self.session = session_factory()
         return self.session
     
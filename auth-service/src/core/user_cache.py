@@ -0,0 +1,97 @@
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from src.core.config import settings
+
+
+class UserPrincipal:
+    """トークン検証に必要な最小限のユーザー情報"""
+    __slots__ = ("user_id", "email", "is_active", "token_version")
+
+    def __init__(self, user_id: str, email: str, is_active: bool, token_version: int = 0):
+        self.user_id = user_id
+        self.email = email
+        self.is_active = is_active
+        self.token_version = token_version
+
+    @classmethod
+    def from_user(cls, user) -> "UserPrincipal":
+        """Userモデルからプリンシパルを生成する"""
+        return cls(str(user.id), user.email, bool(user.is_active), user.token_version)
+
+
+class UserPrincipalCache:
+    """TTLと最大件数で制限されたプロセス内LRUキャッシュ
+
+    asyncioのイベントループ上（単一スレッド）でのみ使用する前提のためロックは持たない。
+    メモリ使用量はエントリ数（max_entries）で制限する。
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        # user_id -> (有効期限, プリンシパル)
+        self._entries: "OrderedDict[str, tuple[float, UserPrincipal]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, user_id: str) -> Optional[UserPrincipal]:
+        """キャッシュからプリンシパルを取得する。期限切れ・未登録の場合はNone"""
+        entry = self._entries.get(user_id)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, principal = entry
+        if expires_at < time.monotonic():
+            del self._entries[user_id]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(user_id)
+        self.hits += 1
+        return principal
+
+    def set(self, principal: UserPrincipal) -> None:
+        """プリンシパルをキャッシュに登録する"""
+        if self.max_entries <= 0:
+            return
+
+        self._entries[principal.user_id] = (time.monotonic() + self.ttl_seconds, principal)
+        self._entries.move_to_end(principal.user_id)
+
+        # 上限を超えた分は最も古いものから追い出す
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, user_id) -> None:
+        """パスワードリセット・無効化・メールアドレス変更時に呼び出す"""
+        self._entries.pop(str(user_id), None)
+
+    def clear(self) -> None:
+        """全エントリと統計情報を破棄する"""
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def stats(self) -> Dict[str, float]:
+        """ヒット率などの統計情報を返す"""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+
+user_cache = UserPrincipalCache(
+    max_entries=settings.USER_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.USER_CACHE_TTL_SECONDS,
+)
@@ -0,0 +1,33 @@
+"""頻繁に実行されるクエリ
+
+リクエストごとにselect()を組み立てるとSQL構築とキャッシュキー生成のコストがかかるため、
+モジュール読み込み時に一度だけ定義し、値はbindparamで渡す。
+SQLAlchemyのコンパイル済みキャッシュとasyncpgのプリペアドステートメントも再利用される。
+
+    db.execute(USER_BY_EMAIL, {"email": email})
+"""
+from sqlalchemy import bindparam, select
+
+from .user import User
+from .token import RefreshToken, PasswordResetToken
+
+
+USER_BY_EMAIL = select(User).where(User.email == bindparam("email"))
+
+USER_BY_ID = select(User).where(User.id == bindparam("user_id"))
+
+# 失効判定を即時に反映するため、ユーザーの現在のtoken_versionも同時に取得する
+ACTIVE_REFRESH_TOKEN_BY_TOKEN = (
+    select(RefreshToken, User.token_version)
+    .join(User, User.id == RefreshToken.user_id)
+    .where(
+        RefreshToken.token == bindparam("token"),
+        RefreshToken.is_revoked == False
+    )
+)
+
+VALID_RESET_TOKEN_BY_TOKEN = select(PasswordResetToken).where(
+    PasswordResetToken.token == bindparam("token"),
+    PasswordResetToken.is_used == False,
+    PasswordResetToken.expires_at > bindparam("now")
+)
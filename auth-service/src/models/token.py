@@ -1,4 +1,5 @@
 import datetime
+from typing import TYPE_CHECKING
 
 from sqlalchemy import Boolean, DateTime, ForeignKey, func, String
 from sqlalchemy.dialects.postgresql import UUID
@@ -6,12 +7,15 @@ from sqlalchemy.orm import Mapped, mapped_column,relationship
 import uuid
 
 from src.models.base import ModelBaseMixin
-from .user import User
+
+if TYPE_CHECKING:
+    # user.py がこのモジュールをインポートするため、実行時には循環させない
+    from .user import User
 
 class RefreshToken(ModelBaseMixin):
     __tablename__ = "refresh_tokens"
 
-    user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("usres.id", ondelete="CASCADE"), nullable=False)
+    user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
     token: Mapped[str] = mapped_column(String, unique=True, nullable=False, index=True)
     expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
@@ -19,7 +23,7 @@ class RefreshToken(ModelBaseMixin):
 
     user: Mapped["User"] = relationship("User", back_populates="refresh_tokens")
 
-class PasswordResetToken(Base):
+class PasswordResetToken(ModelBaseMixin):
     __tablename__ = "password_reset_tokens"
 
     user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
@@ -5,14 +5,12 @@ from passlib.context import CryptContext
 
 from pydantic import BaseModel
 from typing import Optional
-from sqlalchemy import Boolean, DateTime, String, Select
+from sqlalchemy import Boolean, DateTime, Integer, String, Select
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
 
 from .base import ModelBaseMixin, T
 from .token import RefreshToken, PasswordResetToken
-from src.core.session import AsyncContextManager
-from src.schemas.user_schema import UserCreate, UserPasswordSchema, UserUpdate
 
 
 pwd_context = CryptContext(schemes=['bcrypt'], deprecated='auto')
@@ -23,6 +21,8 @@ class User(ModelBaseMixin):
     email: Mapped[str] = mapped_column(String, unique=True, index=True, nullable=False)
     hashed_password: Mapped[str] = mapped_column(String, nullable=False)
     is_active: Mapped[bool] = mapped_column(Boolean, default=True)
+    # インクリメントすると発行済みの全トークンが無効になる
+    token_version: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
     updated_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now(), onupdate=func.now())
 
     refresh_tokens: Mapped[List[RefreshToken]] = relationship("RefreshToken", back_populates="user", cascade="all, delete-orphan")
@@ -32,6 +32,7 @@ class TokenPayload(BaseModel):
     sub: str  # user_id
     exp: datetime
     type: str  # "access" or "refresh"
+    ver: int = 0  # トークン世代（クレーム導入前のトークンは0として扱う）
 
 class UserResponse(BaseModel):
     id: UUID
@@ -1,11 +1,11 @@
 from datetime import datetime, timedelta
 from typing import Optional
-from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import HTTPException, status
 from fastapi_mail import FastMail, MessageSchema, ConnectionConfig
 from src.core.config import settings
 from src.schemas.auth import TokenPayload
+from src.utils.jwt_codec import TokenDecodeError, get_jwt_codec
 import uuid
 
 # パスワードハッシュ化設定
@@ -34,21 +34,26 @@ def get_password_hash(password: str) -> str:
     """パスワードをハッシュ化する"""
     return pwd_context.hash(password)
 
-def create_token(user_id: str, expires_delta: timedelta, token_type: str = "access") -> str:
+def create_token(
+    user_id: str,
+    expires_delta: timedelta,
+    token_type: str = "access",
+    token_version: int = 0
+) -> str:
     """JWTトークンを生成する"""
     expire = datetime.utcnow() + expires_delta
     to_encode = {
         "sub": str(user_id),
         "exp": expire,
-        "type": token_type
+        "type": token_type,
+        "ver": token_version
     }
-    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
-    return encoded_jwt
+    return get_jwt_codec().encode(to_encode)
 
 def verify_token(token: str, token_type: str = "access") -> TokenPayload:
     """トークンを検証する"""
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        payload = get_jwt_codec().decode(token)
         token_data = TokenPayload(**payload)
         
         if token_data.type != token_type:
@@ -58,12 +63,20 @@ def verify_token(token: str, token_type: str = "access") -> TokenPayload:
             )
             
         return token_data
-    except JWTError:
+    except TokenDecodeError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials",
         )
 
+def verify_token_version(token_data: TokenPayload, current_version: int) -> None:
+    """トークン世代がユーザーの現在の世代と一致するか検証する"""
+    if token_data.ver != current_version:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token has been revoked",
+        )
+
 async def send_password_reset_email(email: str, token: str):
     """パスワードリセットメールを送信する"""
     # TODO: 実際のフロントエンドURLに置き換える
@@ -0,0 +1,199 @@
+"""JWTのエンコード・デコード
+
+鍵オブジェクトは起動時に一度だけ読み込んでキャッシュし、呼び出しごとに鍵を再生成しない。
+署名鍵は1つ、検証鍵は鍵ID（kid）ごとに複数持てるため、鍵のローテーション中は
+旧鍵で署名されたトークンも検証できる。
+"""
+from abc import ABC, abstractmethod
+from functools import lru_cache
+from typing import Any, Dict, Optional
+
+import jwt as pyjwt
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.serialization import load_pem_private_key, load_pem_public_key
+from jose import JOSEError, jwk
+from jose import jwt as jose_jwt
+
+from src.core.config import settings
+
+
+HMAC_ALGORITHMS = {"HS256", "HS384", "HS512"}
+
+
+class TokenDecodeError(Exception):
+    """署名・有効期限・鍵IDのいずれかが不正なトークン"""
+
+
+class JWTKey:
+    """鍵IDとアルゴリズムに紐付いた読み込み済みの鍵"""
+    __slots__ = ("kid", "algorithm", "key")
+
+    def __init__(self, kid: str, algorithm: str, key: Any):
+        self.kid = kid
+        self.algorithm = algorithm
+        # HMACはbytes、それ以外はcryptographyの鍵オブジェクト
+        self.key = key
+
+
+def _read_key_source(source: str) -> bytes:
+    """PEM文字列またはファイルパスから鍵データを読み込む"""
+    if source.lstrip().startswith("-----BEGIN"):
+        return source.encode()
+    with open(source, "rb") as f:
+        return f.read()
+
+
+def load_signing_key(kid: str, algorithm: str, secret: str, private_key: Optional[str]) -> JWTKey:
+    """署名鍵を読み込む。HMACの場合はsecretを、それ以外は秘密鍵を使用する"""
+    if algorithm in HMAC_ALGORITHMS:
+        return JWTKey(kid, algorithm, secret.encode())
+    if not private_key:
+        raise ValueError(f"JWT_PRIVATE_KEY is required for {algorithm}")
+    return JWTKey(kid, algorithm, load_pem_private_key(_read_key_source(private_key), password=None))
+
+
+def load_verification_key(kid: str, algorithm: str, source: str) -> JWTKey:
+    """検証鍵を読み込む。HMACの場合はファイルの内容を共有鍵として扱う"""
+    data = _read_key_source(source)
+    if algorithm in HMAC_ALGORITHMS:
+        return JWTKey(kid, algorithm, data.strip())
+    return JWTKey(kid, algorithm, load_pem_public_key(data))
+
+
+class JWTCodec(ABC):
+    """JWTコーデックの基底クラス"""
+    name = ""
+
+    def __init__(self, signing_key: JWTKey, verification_keys: Dict[str, JWTKey]):
+        self.signing_key = signing_key
+        self._signing_key = self.prepare_key(signing_key)
+        self._verification_keys = {
+            kid: (key.algorithm, self.prepare_key(key))
+            for kid, key in verification_keys.items()
+        }
+
+    def prepare_key(self, key: JWTKey) -> Any:
+        """バックエンドが直接使える形式に鍵を変換する（初期化時に一度だけ呼ばれる）"""
+        return key.key
+
+    @abstractmethod
+    def encode(self, claims: Dict[str, Any]) -> str:
+        """クレームに署名してトークンを生成する"""
+
+    @abstractmethod
+    def decode(self, token: str) -> Dict[str, Any]:
+        """トークンを検証してクレームを返す。不正な場合はTokenDecodeError"""
+
+    def _get_verification_key(self, header: Dict[str, Any]):
+        # kidを持たないトークン（導入前に発行されたもの）は現在の署名鍵で検証する
+        kid = header.get("kid", self.signing_key.kid)
+        try:
+            return self._verification_keys[kid]
+        except KeyError:
+            raise TokenDecodeError(f"Unknown key id: {kid}")
+
+
+class PyJWTCodec(JWTCodec):
+    """PyJWTを使用するコーデック（HS256/RS256/EdDSA対応）"""
+    name = "pyjwt"
+
+    def encode(self, claims: Dict[str, Any]) -> str:
+        return pyjwt.encode(
+            claims,
+            self._signing_key,
+            algorithm=self.signing_key.algorithm,
+            headers={"kid": self.signing_key.kid}
+        )
+
+    def decode(self, token: str) -> Dict[str, Any]:
+        try:
+            algorithm, key = self._get_verification_key(pyjwt.get_unverified_header(token))
+            return pyjwt.decode(token, key, algorithms=[algorithm])
+        except pyjwt.PyJWTError as e:
+            raise TokenDecodeError(str(e)) from e
+
+
+class JoseCodec(JWTCodec):
+    """python-joseを使用するコーデック（HS256/RS256対応、EdDSAは非対応）"""
+    name = "jose"
+
+    def prepare_key(self, key: JWTKey) -> Any:
+        if key.algorithm == "EdDSA":
+            raise ValueError("python-jose does not support EdDSA, use JWT_BACKEND=pyjwt")
+        key_data = key.key
+        # joseは秘密鍵オブジェクトを直接受け付けないためPEMに戻してから構築する
+        if hasattr(key_data, "private_bytes"):
+            key_data = key_data.private_bytes(
+                serialization.Encoding.PEM,
+                serialization.PrivateFormat.PKCS8,
+                serialization.NoEncryption()
+            )
+        return jwk.construct(key_data, key.algorithm)
+
+    def encode(self, claims: Dict[str, Any]) -> str:
+        return jose_jwt.encode(
+            claims,
+            self._signing_key,
+            algorithm=self.signing_key.algorithm,
+            headers={"kid": self.signing_key.kid}
+        )
+
+    def decode(self, token: str) -> Dict[str, Any]:
+        try:
+            algorithm, key = self._get_verification_key(jose_jwt.get_unverified_header(token))
+            return jose_jwt.decode(token, key, algorithms=[algorithm])
+        except JOSEError as e:
+            raise TokenDecodeError(str(e)) from e
+
+
+JWT_BACKENDS = {
+    PyJWTCodec.name: PyJWTCodec,
+    JoseCodec.name: JoseCodec,
+}
+
+
+def create_jwt_codec(
+    backend: str,
+    signing_key: JWTKey,
+    previous_keys: Optional[Dict[str, JWTKey]] = None
+) -> JWTCodec:
+    """バックエンド名からコーデックを生成する"""
+    if backend not in JWT_BACKENDS:
+        raise ValueError(f"Unknown JWT backend: {backend}")
+
+    if signing_key.algorithm in HMAC_ALGORITHMS:
+        current = signing_key
+    else:
+        # 自身が署名したトークンの検証には公開鍵を使用する
+        current = JWTKey(signing_key.kid, signing_key.algorithm, signing_key.key.public_key())
+    verification_keys = dict(previous_keys or {})
+    verification_keys[signing_key.kid] = current
+    return JWT_BACKENDS[backend](signing_key, verification_keys)
+
+
+def parse_previous_keys(value: str) -> Dict[str, JWTKey]:
+    """JWT_PREVIOUS_KEYS（"kid:ALG:path" のカンマ区切り）を読み込む"""
+    keys = {}
+    for entry in value.split(","):
+        entry = entry.strip()
+        if not entry:
+            continue
+        kid, algorithm, path = entry.split(":", 2)
+        keys[kid] = load_verification_key(kid, algorithm, path)
+    return keys
+
+
+@lru_cache
+def get_jwt_codec() -> JWTCodec:
+    """設定からコーデックを生成する（プロセスごとに一度だけ）"""
+    signing_key = load_signing_key(
+        settings.JWT_KEY_ID,
+        settings.ALGORITHM,
+        settings.SECRET_KEY,
+        settings.JWT_PRIVATE_KEY
+    )
+    return create_jwt_codec(
+        settings.JWT_BACKEND,
+        signing_key,
+        parse_previous_keys(settings.JWT_PREVIOUS_KEYS)
+    )
@@ -0,0 +1,14 @@
+import os
+
+
+# Settings の必須項目（テストでは実際には使用しない）
+for key, value in {
+    "DATABASE_URL": "postgresql+asyncpg://localhost/test",
+    "SECRET_KEY": "test-secret-key",
+    "MAIL_USERNAME": "test",
+    "MAIL_PASSWORD": "test",
+    "MAIL_FROM": "test@example.com",
+    "MAIL_PORT": "587",
+    "MAIL_SERVER": "localhost",
+}.items():
+    os.environ.setdefault(key, value)
@@ -0,0 +1,118 @@
+"""認証ルートのトークン世代・ユーザーキャッシュのテスト
+
+ルート関数にSQLite（aiosqlite）のセッションを直接渡して実行する。
+"""
+from datetime import datetime, timedelta
+
+import pytest
+import pytest_asyncio
+from fastapi import HTTPException
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from src.api.routes.auth import confirm_password_reset, verify_token_endpoint
+from src.core.database import Base
+from src.core.user_cache import UserPrincipal, user_cache
+from src.models.token import PasswordResetToken
+from src.models.user import User
+from src.schemas.auth import PasswordResetConfirm
+from src.utils.auth_utils import create_token, get_password_hash, verify_password
+
+
+@pytest_asyncio.fixture
+async def session():
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    user_cache.clear()
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        yield session
+    user_cache.clear()
+    await engine.dispose()
+
+
+@pytest_asyncio.fixture
+async def user(session):
+    user = User(email="user@example.com", hashed_password=get_password_hash("old-password"))
+    session.add(user)
+    await session.commit()
+    return user
+
+
+def access_token(user, token_version: int) -> str:
+    return create_token(str(user.id), timedelta(minutes=5), "access", token_version)
+
+
+async def set_token_version(session, user, token_version: int) -> None:
+    await session.execute(
+        update(User).where(User.id == user.id).values(token_version=token_version)
+    )
+    await session.commit()
+
+
+@pytest.mark.asyncio
+async def test_confirm_password_reset_invalidates_cached_principal(session, user):
+    session.add(PasswordResetToken(
+        user_id=user.id,
+        token="reset-token",
+        expires_at=datetime.utcnow() + timedelta(hours=1)
+    ))
+    await session.commit()
+    old_token = access_token(user, 0)
+    await verify_token_endpoint(old_token, db=session, primary_db=session)
+    assert user_cache.get(str(user.id)) is not None
+
+    await confirm_password_reset(
+        PasswordResetConfirm(token="reset-token", new_password="new-password"),
+        db=session
+    )
+
+    assert user_cache.get(str(user.id)) is None
+    await session.refresh(user)
+    assert user.token_version == 1
+    assert verify_password("new-password", user.hashed_password)
+    with pytest.raises(HTTPException) as exc_info:
+        await verify_token_endpoint(old_token, db=session, primary_db=session)
+    assert exc_info.value.detail == "Token has been revoked"
+
+
+@pytest.mark.asyncio
+async def test_newer_token_refreshes_stale_cached_principal(session, user):
+    # 別ワーカーでのリセット後に発行されたトークン（このワーカーのキャッシュは古い世代のまま）
+    user_cache.set(UserPrincipal(str(user.id), user.email, True, 0))
+    await set_token_version(session, user, 1)
+
+    result = await verify_token_endpoint(access_token(user, 1), db=session, primary_db=session)
+
+    assert result["user_id"] == str(user.id)
+    assert user_cache.get(str(user.id)).token_version == 1
+
+
+class FailingSession:
+    """使用された場合に失敗するセッション"""
+
+    async def execute(self, *args, **kwargs):
+        raise AssertionError("database should not be queried")
+
+
+@pytest.mark.asyncio
+async def test_older_token_is_rejected_without_reading_database(user):
+    user_cache.set(UserPrincipal(str(user.id), user.email, True, 2))
+
+    with pytest.raises(HTTPException) as exc_info:
+        await verify_token_endpoint(
+            access_token(user, 1), db=FailingSession(), primary_db=FailingSession()
+        )
+    assert exc_info.value.status_code == 401
+    assert exc_info.value.detail == "Token has been revoked"
+
+
+@pytest.mark.asyncio
+async def test_newer_token_is_checked_against_primary(session, user):
+    # レプリカ（db）は古い世代を返すが、プライマリでは更新済み
+    await set_token_version(session, user, 1)
+    user_cache.set(UserPrincipal(str(user.id), user.email, True, 0))
+
+    await verify_token_endpoint(access_token(user, 1), db=FailingSession(), primary_db=session)
+
+    assert user_cache.get(str(user.id)).token_version == 1
@@ -0,0 +1,58 @@
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+
+from src.utils.auth_utils import create_token, verify_token, verify_token_version
+from src.utils.jwt_codec import get_jwt_codec
+
+
+def test_create_token_embeds_token_version():
+    token = create_token("user-id", timedelta(minutes=5), token_version=3)
+
+    assert get_jwt_codec().decode(token)["ver"] == 3
+    assert verify_token(token).ver == 3
+
+
+def test_refresh_token_embeds_token_version():
+    token = create_token("user-id", timedelta(days=1), token_type="refresh", token_version=2)
+
+    token_data = verify_token(token, token_type="refresh")
+
+    assert token_data.type == "refresh"
+    assert token_data.ver == 2
+
+
+def test_token_without_version_decodes_to_zero():
+    # verクレーム導入前に発行されたトークン
+    legacy_token = get_jwt_codec().encode({
+        "sub": "user-id",
+        "exp": datetime.utcnow() + timedelta(minutes=5),
+        "type": "access",
+    })
+
+    assert verify_token(legacy_token).ver == 0
+
+
+def test_verify_token_version_accepts_current_version():
+    token_data = verify_token(create_token("user-id", timedelta(minutes=5), token_version=1))
+
+    verify_token_version(token_data, 1)
+
+
+@pytest.mark.parametrize("current_version", [0, 2])
+def test_verify_token_version_rejects_mismatch(current_version):
+    token_data = verify_token(create_token("user-id", timedelta(minutes=5), token_version=1))
+
+    with pytest.raises(HTTPException) as exc_info:
+        verify_token_version(token_data, current_version)
+    assert exc_info.value.status_code == 401
+    assert exc_info.value.detail == "Token has been revoked"
+
+
+def test_wrong_token_type_is_rejected():
+    token = create_token("user-id", timedelta(minutes=5), token_type="refresh")
+
+    with pytest.raises(HTTPException) as exc_info:
+        verify_token(token, token_type="access")
+    assert exc_info.value.status_code == 401
@@ -0,0 +1,125 @@
+from datetime import datetime, timedelta
+
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
+from jose import jwt as jose_jwt
+
+from src.utils.jwt_codec import (
+    JWT_BACKENDS, JWTCodec, JWTKey, TokenDecodeError, create_jwt_codec,
+    parse_previous_keys
+)
+
+
+@pytest.fixture(scope="module")
+def rsa_key():
+    return rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+
+@pytest.fixture(scope="module")
+def signing_keys(rsa_key):
+    return {
+        "HS256": b"test-secret",
+        "RS256": rsa_key,
+        "EdDSA": ed25519.Ed25519PrivateKey.generate(),
+    }
+
+
+def claims(**overrides):
+    return {
+        "sub": "user-id",
+        "exp": datetime.utcnow() + timedelta(minutes=5),
+        "type": "access",
+        "ver": 0,
+        **overrides,
+    }
+
+
+def supported(backend: str, algorithm: str) -> bool:
+    return not (backend == "jose" and algorithm == "EdDSA")
+
+
+def public_pem(private_key) -> str:
+    return private_key.public_key().public_bytes(
+        serialization.Encoding.PEM,
+        serialization.PublicFormat.SubjectPublicKeyInfo
+    ).decode()
+
+
+@pytest.mark.parametrize("backend", JWT_BACKENDS)
+@pytest.mark.parametrize("algorithm", ["HS256", "RS256", "EdDSA"])
+def test_round_trip(backend, algorithm, signing_keys):
+    if not supported(backend, algorithm):
+        pytest.skip("python-jose does not support EdDSA")
+    codec = create_jwt_codec(backend, JWTKey("current", algorithm, signing_keys[algorithm]))
+
+    token = codec.encode(claims())
+
+    assert jose_jwt.get_unverified_header(token)["kid"] == "current"
+    assert codec.decode(token)["sub"] == "user-id"
+
+
+@pytest.mark.parametrize("backend", JWT_BACKENDS)
+def test_token_without_kid_is_verified_with_current_key(backend):
+    codec = create_jwt_codec(backend, JWTKey("current", "HS256", b"test-secret"))
+    # kid導入前にjose.jwtで発行されたトークン
+    legacy_token = jose_jwt.encode(claims(), "test-secret", algorithm="HS256")
+
+    assert codec.decode(legacy_token)["sub"] == "user-id"
+
+
+@pytest.mark.parametrize("backend", JWT_BACKENDS)
+def test_previous_keys_are_accepted(backend, rsa_key, tmp_path):
+    old_secret = tmp_path / "old-secret"
+    old_secret.write_text("old-secret\n")
+    old_public_key = tmp_path / "old-rsa.pem"
+    old_public_key.write_text(public_pem(rsa_key))
+    previous_keys = parse_previous_keys(
+        f"old-hs:HS256:{old_secret}, old-rs:RS256:{old_public_key}"
+    )
+    codec = create_jwt_codec(backend, JWTKey("current", "HS256", b"new-secret"), previous_keys)
+
+    old_hs = create_jwt_codec(backend, JWTKey("old-hs", "HS256", b"old-secret"))
+    old_rs = create_jwt_codec(backend, JWTKey("old-rs", "RS256", rsa_key))
+
+    assert codec.decode(old_hs.encode(claims()))["sub"] == "user-id"
+    assert codec.decode(old_rs.encode(claims()))["sub"] == "user-id"
+    assert codec.decode(codec.encode(claims()))["sub"] == "user-id"
+
+
+@pytest.mark.parametrize("backend", JWT_BACKENDS)
+def test_unknown_kid_is_rejected(backend):
+    codec = create_jwt_codec(backend, JWTKey("current", "HS256", b"test-secret"))
+    # 同じ共有鍵で署名されていても、登録されていないkidは受け付けない
+    other = create_jwt_codec(backend, JWTKey("unknown", "HS256", b"test-secret"))
+
+    with pytest.raises(TokenDecodeError, match="Unknown key id"):
+        codec.decode(other.encode(claims()))
+
+
+@pytest.mark.parametrize("backend", JWT_BACKENDS)
+@pytest.mark.parametrize("token_factory", [
+    lambda codec: codec.encode(claims(exp=datetime.utcnow() - timedelta(minutes=1))),
+    lambda codec: create_jwt_codec(codec.name, JWTKey("current", "HS256", b"other")).encode(claims()),
+    lambda codec: "not-a-token",
+], ids=["expired", "bad-signature", "malformed"])
+def test_invalid_tokens_are_rejected(backend, token_factory):
+    codec = create_jwt_codec(backend, JWTKey("current", "HS256", b"test-secret"))
+
+    with pytest.raises(TokenDecodeError):
+        codec.decode(token_factory(codec))
+
+
+def test_jose_rejects_eddsa(signing_keys):
+    with pytest.raises(ValueError, match="EdDSA"):
+        create_jwt_codec("jose", JWTKey("current", "EdDSA", signing_keys["EdDSA"]))
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError, match="Unknown JWT backend"):
+        create_jwt_codec("unknown", JWTKey("current", "HS256", b"test-secret"))
+
+
+def test_codec_base_class_is_abstract():
+    with pytest.raises(TypeError):
+        JWTCodec(JWTKey("current", "HS256", b"test-secret"), {})
@@ -0,0 +1,96 @@
+import pytest
+
+from src.core import migrate
+from src.core.config import Settings
+
+
+DATABASE_ENV = {
+    "DATABASE_HOST": "db.internal",
+    "DATABASE_PORT": "6432",
+    "DATABASE_USER": "auth",
+    "DATABASE_PASSWORD": "secret",
+    "DATABASE_NAME": "auth_db",
+}
+
+
+@pytest.fixture
+def no_env_file(tmp_path, monkeypatch):
+    # リポジトリ直下の.envを読み込まないようにする
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def app_url_parts(settings: Settings):
+    return (
+        settings.database_host, settings.database_port, settings.database_user,
+        settings.database_password, settings.database_name
+    )
+
+
+def migrate_url_parts():
+    url = migrate.get_database_url()
+    return url.host, url.port, url.username, url.password, url.database
+
+
+def test_database_url_matches_app_settings_from_environment(no_env_file, monkeypatch):
+    for key, value in DATABASE_ENV.items():
+        monkeypatch.setenv(key, value)
+
+    assert migrate_url_parts() == app_url_parts(Settings())
+    assert migrate_url_parts() == ("db.internal", 6432, "auth", "secret", "auth_db")
+
+
+def test_database_url_matches_app_settings_from_env_file(no_env_file, monkeypatch):
+    for key in DATABASE_ENV:
+        monkeypatch.delenv(key, raising=False)
+    (no_env_file / ".env").write_text(
+        "".join(f"{key}={value}\n" for key, value in DATABASE_ENV.items())
+    )
+    # 環境変数は.envより優先される
+    monkeypatch.setenv("DATABASE_HOST", "override")
+
+    assert migrate_url_parts() == app_url_parts(Settings())
+    assert migrate_url_parts()[0] == "override"
+
+
+def test_database_url_defaults_match_app_settings(no_env_file, monkeypatch):
+    for key in DATABASE_ENV:
+        monkeypatch.delenv(key, raising=False)
+
+    assert migrate_url_parts() == app_url_parts(Settings())
+
+
+class FakeLockConnection:
+    """pg_try_advisory_lockの結果を順に返す接続"""
+
+    def __init__(self, results):
+        self.results = list(results)
+        self.attempts = 0
+
+    def execute(self, statement, parameters):
+        self.attempts += 1
+        return self
+
+    def scalar_one(self):
+        return self.results.pop(0) if self.results else False
+
+    def commit(self):
+        pass
+
+
+def test_acquire_lock_retries_until_acquired(monkeypatch):
+    monkeypatch.setattr(migrate, "MIGRATION_LOCK_POLL_INTERVAL", 0)
+    connection = FakeLockConnection([False, False, True])
+
+    migrate.acquire_lock(connection, timeout=5)
+
+    assert connection.attempts == 3
+
+
+def test_acquire_lock_times_out(monkeypatch):
+    monkeypatch.setattr(migrate, "MIGRATION_LOCK_POLL_INTERVAL", 0.01)
+    connection = FakeLockConnection([])
+
+    with pytest.raises(TimeoutError):
+        migrate.acquire_lock(connection, timeout=0.05)
+    assert connection.attempts > 1
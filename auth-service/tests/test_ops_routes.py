@@ -0,0 +1,38 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.api.routes import ops
+from src.core.config import settings
+from src.core.user_cache import user_cache
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.include_router(ops.router, prefix="/ops")
+    user_cache.clear()
+    yield TestClient(app)
+    user_cache.clear()
+
+
+def test_metrics_are_disabled_without_ops_token(client, monkeypatch):
+    monkeypatch.setattr(settings, "OPS_API_TOKEN", None)
+
+    assert client.get("/ops/metrics/user-cache").status_code == 404
+
+
+@pytest.mark.parametrize("headers", [{}, {"X-Ops-Token": "wrong"}])
+def test_metrics_require_ops_token(client, monkeypatch, headers):
+    monkeypatch.setattr(settings, "OPS_API_TOKEN", "ops-secret")
+
+    assert client.get("/ops/metrics/user-cache", headers=headers).status_code == 401
+
+
+def test_metrics_return_cache_stats(client, monkeypatch):
+    monkeypatch.setattr(settings, "OPS_API_TOKEN", "ops-secret")
+
+    response = client.get("/ops/metrics/user-cache", headers={"X-Ops-Token": "ops-secret"})
+
+    assert response.status_code == 200
+    assert response.json() == user_cache.stats()
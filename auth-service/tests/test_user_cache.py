@@ -0,0 +1,115 @@
+import uuid
+
+import pytest
+
+from src.core import user_cache as user_cache_module
+from src.core.user_cache import UserPrincipal, UserPrincipalCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(user_cache_module.time, "monotonic", clock)
+    return clock
+
+
+def principal(user_id: str, token_version: int = 0) -> UserPrincipal:
+    return UserPrincipal(user_id, f"{user_id}@example.com", True, token_version)
+
+
+def test_get_returns_cached_principal(clock):
+    cache = UserPrincipalCache(max_entries=10, ttl_seconds=60)
+    cache.set(principal("a"))
+
+    assert cache.get("a").email == "a@example.com"
+    assert cache.get("b") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+    assert cache.stats()["hit_ratio"] == 0.5
+
+
+def test_entry_expires_after_ttl(clock):
+    cache = UserPrincipalCache(max_entries=10, ttl_seconds=60)
+    cache.set(principal("a"))
+
+    clock.now += 60
+    assert cache.get("a") is not None
+
+    clock.now += 1
+    assert cache.get("a") is None
+    assert cache.stats()["size"] == 0
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    cache = UserPrincipalCache(max_entries=2, ttl_seconds=60)
+    cache.set(principal("a"))
+    cache.set(principal("b"))
+    # aを参照するとbが最も古くなる
+    cache.get("a")
+    cache.set(principal("c"))
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_set_replaces_existing_entry(clock):
+    cache = UserPrincipalCache(max_entries=10, ttl_seconds=60)
+    cache.set(principal("a", token_version=0))
+    cache.set(principal("a", token_version=1))
+
+    assert cache.get("a").token_version == 1
+    assert cache.stats()["size"] == 1
+
+
+@pytest.mark.parametrize("max_entries", [0, -1])
+def test_non_positive_max_entries_disables_cache(clock, max_entries):
+    cache = UserPrincipalCache(max_entries=max_entries, ttl_seconds=60)
+    cache.set(principal("a"))
+
+    assert cache.get("a") is None
+    assert cache.stats()["size"] == 0
+
+
+def test_invalidate_accepts_uuid_and_str(clock):
+    user_id = uuid.uuid4()
+    cache = UserPrincipalCache(max_entries=10, ttl_seconds=60)
+
+    cache.set(principal(str(user_id)))
+    cache.invalidate(user_id)
+    assert cache.get(str(user_id)) is None
+
+    cache.set(principal(str(user_id)))
+    cache.invalidate(str(user_id))
+    assert cache.get(str(user_id)) is None
+
+
+def test_hit_ratio_is_zero_without_lookups():
+    cache = UserPrincipalCache(max_entries=10, ttl_seconds=60)
+
+    assert cache.stats()["hit_ratio"] == 0.0
+
+
+def test_clear_resets_entries_and_stats(clock):
+    cache = UserPrincipalCache(max_entries=10, ttl_seconds=60)
+    cache.set(principal("a"))
+    cache.get("a")
+    cache.clear()
+
+    assert cache.stats() == {
+        "size": 0,
+        "max_entries": 10,
+        "hits": 0,
+        "misses": 0,
+        "evictions": 0,
+        "hit_ratio": 0.0,
+    }